@@ -0,0 +1,40 @@
+# cython: language_level=3
+"""C 层文件读取/编码：海量小文件场景下绕过 Python 文件对象的逐层开销"""
+from libc.stdio cimport FILE, fopen, fread, fclose, fseek, ftell, SEEK_END, SEEK_SET
+from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_AS_STRING
+
+import os
+import base64
+try:
+    import pybase64 as _base64
+except ImportError:
+    _base64 = base64
+
+
+def read_file(path):
+    """一次 fread 读入整个文件，I/O 期间释放 GIL"""
+    cdef bytes path_bytes = os.fsencode(path)
+    cdef FILE* fp = fopen(path_bytes, b"rb")
+    cdef long size
+    cdef size_t nread
+    cdef char* buf
+    if fp == NULL:
+        raise OSError(f"无法打开文件: {path!r}")
+    try:
+        fseek(fp, 0, SEEK_END)
+        size = ftell(fp)
+        fseek(fp, 0, SEEK_SET)
+        data = PyBytes_FromStringAndSize(NULL, size)
+        buf = PyBytes_AS_STRING(data)
+        with nogil:
+            nread = fread(buf, 1, <size_t>size, fp)
+        if nread != <size_t>size:
+            raise OSError(f"读取文件失败: {path!r}")
+    finally:
+        fclose(fp)
+    return data
+
+
+def encode_file(path):
+    """读入文件并返回 base64 字符串"""
+    return _base64.b64encode(read_file(path)).decode('ascii')
@@ -1,16 +1,73 @@
 import sys
 import os
+import asyncio
+import gzip
 import json
+import mmap
+import pathlib
+import queue
+import shutil
+import tempfile
+import threading
 import base64
+from urllib.parse import quote
+try:
+    import pybase64 as _base64  # SIMD 加速的 base64 实现
+except ImportError:
+    _base64 = base64
+_b64encode = _base64.b64encode  # 模块级绑定，热循环里省掉两次属性查找
+try:
+    import orjson  # C 实现的 JSON 序列化，几 MB 的 base64 字符串上明显快于标准库
+except ImportError:
+    orjson = None
+try:
+    import pygit2  # libgit2：装了就用一次 git push 批量上传，pack 压缩替代 base64
+except ImportError:
+    pygit2 = None
+try:
+    import fastenc  # Cython 扩展（见 setup.py），C 层 fread 加速小文件读取
+except ImportError:
+    fastenc = None
+try:
+    import aiohttp  # 装了就在 worker 线程里跑 asyncio 管线，单线程挂起全部在途请求
+except ImportError:
+    aiohttp = None
+
+import requests.models
+
+if orjson is not None:
+    # 让 requests（进而 python-gitlab）的请求体序列化走 orjson
+    class _OrjsonShim:
+        JSONDecodeError = json.JSONDecodeError
+
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj).decode('utf-8')
+
+        @staticmethod
+        def loads(s, **kwargs):
+            return orjson.loads(s)
+
+    requests.models.complexjson = _OrjsonShim
+
+    _json_dumps_bytes = orjson.dumps
+else:
+    def _json_dumps_bytes(obj):
+        return json.dumps(obj).encode('utf-8')
+
 import gitlab
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from gitlab.exceptions import GitlabCreateError
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QFileDialog, QLineEdit,
                              QProgressBar, QTextEdit, QSystemTrayIcon, QMenu, QAction, QComboBox)
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, Qt
 from PyQt5.QtGui import QIcon
 
 CONFIG_DIR = os.path.expanduser("~/.gitlabuploader")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+MANIFEST_FILE = os.path.join(CONFIG_DIR, "manifest.json")
 
 def get_logo_path():
     if getattr(sys, 'frozen', False):
@@ -18,6 +75,80 @@ def get_logo_path():
     else:
         return os.path.join(os.path.dirname(__file__), 'logo.png')
 
+B64_CHUNK_SIZE = 49152  # 48 KiB，取 3 的倍数，分块编码不会在中途产生填充
+MMAP_THRESHOLD = 65536  # 小于 64 KiB 的文件不值得承担 mmap 的建立开销
+UPLOAD_WORKERS = 8  # 并发上传线程数
+ASYNC_CONCURRENCY = 16  # aiohttp 管线的在途请求上限
+COMMIT_BATCH_SIZE = 20  # 每个 commit 包含的文件数，一次 HTTP 往返提交一批文件
+
+# commit 请求体里不变的键值对只构造一次，循环里合并进去即可
+_COMMIT_TEMPLATE = {'branch': 'main', 'commit_message': 'Upload file'}
+
+def encode_file_base64(file_path):
+    """分块读取文件并进行 base64 编码，避免原始内容和编码结果同时驻留内存"""
+    size = os.path.getsize(file_path)
+    out = bytearray((size + 2) // 3 * 4)
+    pos = 0
+    with open(file_path, 'rb') as f:
+        if size > MMAP_THRESHOLD:
+            # 大文件直接映射内核页缓存，memoryview 切片零拷贝地喂给编码器
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    for offset in range(0, size, B64_CHUNK_SIZE):
+                        encoded = _b64encode(view[offset:offset + B64_CHUNK_SIZE])
+                        out[pos:pos + len(encoded)] = encoded
+                        pos += len(encoded)
+        else:
+            while chunk := f.read(B64_CHUNK_SIZE):
+                encoded = _b64encode(chunk)
+                out[pos:pos + len(encoded)] = encoded
+                pos += len(encoded)
+    return out.decode('ascii')
+
+def load_file_content(file_path):
+    """读取文件内容：UTF-8 文本原样发送（encoding='text'），二进制才走 base64"""
+    size = os.path.getsize(file_path)
+    if size > MMAP_THRESHOLD:
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    try:
+                        return str(view, 'utf-8'), 'text'
+                    except UnicodeDecodeError:
+                        pass
+        return encode_file_base64(file_path), 'base64'
+    if fastenc is not None:
+        raw = fastenc.read_file(file_path)
+    else:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+    try:
+        return raw.decode('utf-8'), 'text'
+    except UnicodeDecodeError:
+        return _b64encode(raw).decode('ascii'), 'base64'
+
+GZIP_MIN_BODY = 1024  # 请求体超过 1 KiB 才值得压缩
+
+def enable_request_gzip(session):
+    """包装 session.request：较大的请求体先 gzip 压缩再上线路"""
+    original_request = session.request
+
+    def request(method, url, *, data=None, json=None, headers=None, **kwargs):
+        if json is not None and data is None:
+            data = _json_dumps_bytes(json)
+            headers = dict(headers or {})
+            headers.setdefault('Content-Type', 'application/json')
+            json = None
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if isinstance(data, bytes) and len(data) > GZIP_MIN_BODY:
+            data = gzip.compress(data)
+            headers = dict(headers or {})
+            headers['Content-Encoding'] = 'gzip'
+        return original_request(method, url, data=data, json=json, headers=headers, **kwargs)
+
+    session.request = request
+
 def ensure_config_directory():
     """确保配置目录存在，如果不存在则创建它"""
     if not os.path.exists(CONFIG_DIR):
@@ -41,6 +172,31 @@ def clear_config():
     """清除配置文件"""
     if os.path.exists(CONFIG_FILE):
         os.remove(CONFIG_FILE)
+    if os.path.exists(MANIFEST_FILE):
+        os.remove(MANIFEST_FILE)
+
+def manifest_key(gitlab_url, project_id):
+    """清单按 (GitLab URL, 项目 ID) 分组，换项目或换实例时不会误跳过文件"""
+    return f"{gitlab_url.rstrip('/')}#{project_id}"
+
+def load_manifest():
+    """加载上传清单：项目 -> {路径 -> [mtime_ns, size]}，用于跳过未变化的文件"""
+    ensure_config_directory()
+    if os.path.exists(MANIFEST_FILE):
+        try:
+            with open(MANIFEST_FILE, 'r') as file:
+                data = json.load(file)
+            # 丢弃旧版未按项目分组的条目
+            return {key: value for key, value in data.items() if isinstance(value, dict)}
+        except (OSError, json.JSONDecodeError):
+            pass
+    return {}
+
+def save_manifest(manifest):
+    """保存上传清单"""
+    ensure_config_directory()
+    with open(MANIFEST_FILE, 'w') as file:
+        json.dump(manifest, file)
 
 class UploadWorker(QThread):
     log_signal = pyqtSignal(str)
@@ -57,18 +213,37 @@ class UploadWorker(QThread):
         try:
             gl = gitlab.Gitlab(url=self.gitlab_url, private_token=self.token)
 
+            # 扩大连接池并启用重试，上传线程复用 keep-alive 连接，省去每个请求的 TCP+TLS 握手。
+            # 默认的 allowed_methods 不含 POST，必须显式加上，否则 commit 请求不会被重试；
+            # 429/5xx 表示提交已被拒绝，重发是安全的
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=16,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 502, 503, 504],
+                    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"}
+                )
+            )
+            gl.session.mount('https://', adapter)
+            gl.session.mount('http://', adapter)
+
+            # base64 后的文本压缩率很高，压缩请求体能显著减少上行字节数
+            enable_request_gzip(gl.session)
+
             try:
                 project = gl.projects.get(self.project_id)
             except gitlab.exceptions.GitlabGetError:
                 self.log_signal.emit("<b style='color:red;'>项目 ID 无效或无法访问！</b>")
                 return
 
-            files_to_upload = []
             self.log_signal.emit("获取文件数量...")
-            for root, _, files in os.walk(self.file_path):
-                for file in files:
-                    file_full_path = os.path.join(root, file)
-                    files_to_upload.append(file_full_path)
+            # rglob 直接给出完整路径，relative_to().as_posix() 一步得到仓库内路径，
+            # 省去逐文件的 join 和 Windows 反斜杠替换
+            base = pathlib.Path(self.file_path)
+            files_to_upload = [(path, path.relative_to(base).as_posix())
+                               for path in base.rglob('*') if path.is_file()]
 
             total_files = len(files_to_upload)
             if total_files == 0:
@@ -77,34 +252,205 @@ class UploadWorker(QThread):
 
             self.log_signal.emit(f"共有{total_files}个文件")
 
-            for index, file_full_path in enumerate(files_to_upload):
-                with open(file_full_path, 'rb') as f:
-                    content = f.read()
-                    b64_content = base64.b64encode(content).decode('utf-8')
-
-                parsed_file_path = file_full_path[len(self.file_path) + 1:].replace("\\", "/")
-                self.log_signal.emit(f"上传 {parsed_file_path}...")
+            # 本地清单记录上次成功上传时的 (mtime, size)：都没变的文件整个跳过，
+            # 少做工作比做得快更省。条目按目标项目分组，只信任当前项目的记录
+            manifests = load_manifest()
+            project_key = manifest_key(self.gitlab_url, self.project_id)
+            manifest = manifests.get(project_key, {})
+            manifest_lock = threading.Lock()
+
+            def persist_manifest():
+                manifests[project_key] = manifest
+                save_manifest(manifests)
+            new_keys = {}
+            pending = []
+            for file_full_path, parsed_file_path in files_to_upload:
+                file_stat = os.stat(file_full_path)
+                key = [file_stat.st_mtime_ns, file_stat.st_size]
+                if manifest.get(parsed_file_path) == key:
+                    continue
+                new_keys[parsed_file_path] = key
+                pending.append((file_full_path, parsed_file_path))
+
+            if len(pending) < total_files:
+                self.log_signal.emit(f"{total_files - len(pending)}个文件自上次上传未变化，跳过")
+            if not pending:
+                self.progress_signal.emit(100)
+                self.log_signal.emit("<b style='color:green;'>所有文件上传完成！</b>")
+                return
+            files_to_upload = pending
+            total_files = len(pending)
+
+            def record_uploaded(actions):
+                with manifest_lock:
+                    for action in actions:
+                        manifest[action['file_path']] = new_keys[action['file_path']]
+
+            # 装了 pygit2 时走 git push：一条 HTTPS 流推送整个 pack，
+            # 增量压缩替代 base64 膨胀，也省掉逐批的 REST 往返
+            if pygit2 is not None:
+                self.upload_with_git(project, files_to_upload, total_files)
+                manifest.update(new_keys)
+                persist_manifest()
+                self.log_signal.emit("<b style='color:green;'>所有文件上传完成！</b>")
+                return
 
-                try:
-                    project.files.create({
+            # 一次性列出分支上已有的文件：重复上传时直接选 update，
+            # 不用逐个 create 吃 409 再浪费一次往返
+            try:
+                existing_paths = {entry['path']
+                                  for entry in project.repository_tree(recursive=True, iterator=True)
+                                  if entry['type'] == 'blob'}
+            except gitlab.exceptions.GitlabGetError:
+                existing_paths = set()  # 空仓库还没有树
+
+            batches = [files_to_upload[i:i + COMMIT_BATCH_SIZE]
+                       for i in range(0, total_files, COMMIT_BATCH_SIZE)]
+
+            def build_actions(batch):
+                actions = []
+                for file_full_path, parsed_file_path in batch:
+                    self.log_signal.emit(f"上传 {parsed_file_path}...")
+                    content, content_encoding = load_file_content(file_full_path)
+                    actions.append({
+                        'action': 'update' if parsed_file_path in existing_paths else 'create',
                         'file_path': parsed_file_path,
-                        'branch': 'main',
-                        'content': b64_content,
-                        'commit_message': 'Upload file',
-                        'encoding': 'base64'
+                        'content': content,
+                        'encoding': content_encoding
                     })
-                except GitlabCreateError as e:
-                    self.log_signal.emit(f"<b style='color:red;'>上传错误: {str(e)}</b>")
+                return actions
+
+            # 装了 aiohttp 时整个管线跑在本线程自己的事件循环上：
+            # 一个线程同时挂起所有在途请求，编码丢给 to_thread 的线程池
+            if aiohttp is not None:
+                asyncio.run(self.upload_batches_async(
+                    batches, build_actions, total_files, record_uploaded))
+                persist_manifest()
+                self.log_signal.emit("<b style='color:green;'>所有文件上传完成！</b>")
+                return
 
-                # 更新进度条
-                progress = int((index + 1) / total_files * 100)
-                self.progress_signal.emit(progress)
+            # 读取/编码和网络上传由不同线程承担：读线程预先编码好下几批文件，
+            # 上传线程只做 HTTPS 往返。队列容量设为 4，限制编码结果占用的内存
+            job_queue = queue.Queue(maxsize=4)
+
+            def read_batches():
+                try:
+                    for batch in batches:
+                        job_queue.put((build_actions(batch), len(batch)))
+                except Exception as e:
+                    self.log_signal.emit(f"<b style='color:red;'>读取文件错误: {str(e)}</b>")
+                finally:
+                    # 哨兵通知所有上传线程结束
+                    for _ in range(UPLOAD_WORKERS):
+                        job_queue.put(None)
+
+            completed = 0
+            last_progress = -1
+            progress_lock = threading.Lock()
+
+            def upload_batches():
+                nonlocal completed, last_progress
+                while (job := job_queue.get()) is not None:
+                    actions, batch_size = job
+
+                    # 一次 commit 提交整批文件，N 个请求合并成 ceil(N/20) 个
+                    try:
+                        project.commits.create({**_COMMIT_TEMPLATE, 'actions': actions})
+                        record_uploaded(actions)
+                    except GitlabCreateError as e:
+                        self.log_signal.emit(f"<b style='color:red;'>上传错误: {str(e)}</b>")
+
+                    # 更新进度条：百分比没变化就不给界面线程发事件
+                    with progress_lock:
+                        completed += batch_size
+                        progress = completed * 100 // total_files
+                        changed = progress != last_progress
+                        last_progress = progress
+                    if changed:
+                        self.progress_signal.emit(progress)
+
+            reader = threading.Thread(target=read_batches, daemon=True)
+            reader.start()
+            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                for future in as_completed([executor.submit(upload_batches)
+                                            for _ in range(UPLOAD_WORKERS)]):
+                    future.result()
+            reader.join()
+            persist_manifest()
 
             self.log_signal.emit("<b style='color:green;'>所有文件上传完成！</b>")
 
         except Exception as e:
             self.log_signal.emit(f"<b style='color:red;'>发生异常: {str(e)}</b>")
 
+    async def upload_batches_async(self, batches, build_actions, total_files, record_uploaded):
+        """aiohttp 管线：并发 POST 各批 commit，信号量限制在途请求和内存占用"""
+        completed = 0
+        last_progress = -1
+        url = (f"{self.gitlab_url.rstrip('/')}/api/v4/projects/"
+               f"{quote(str(self.project_id), safe='')}/repository/commits")
+        base_headers = {'PRIVATE-TOKEN': self.token, 'Content-Type': 'application/json'}
+        semaphore = asyncio.Semaphore(ASYNC_CONCURRENCY)
+
+        connector = aiohttp.TCPConnector(limit=ASYNC_CONCURRENCY)
+        async with aiohttp.ClientSession(connector=connector) as session:
+
+            async def upload_batch(batch):
+                nonlocal completed, last_progress
+                # 信号量先于编码获取：同时驻留内存的编码结果不超过并发数
+                async with semaphore:
+                    actions = await asyncio.to_thread(build_actions, batch)
+                    body = _json_dumps_bytes({**_COMMIT_TEMPLATE, 'actions': actions})
+                    headers = base_headers
+                    if len(body) > GZIP_MIN_BODY:
+                        body = gzip.compress(body)
+                        headers = {**base_headers, 'Content-Encoding': 'gzip'}
+                    async with session.post(url, data=body, headers=headers) as response:
+                        if response.status >= 400:
+                            detail = await response.text()
+                            self.log_signal.emit(f"<b style='color:red;'>上传错误: {detail}</b>")
+                        else:
+                            record_uploaded(actions)
+
+                # 更新进度条（事件循环单线程，不需要锁）
+                completed += len(batch)
+                progress = completed * 100 // total_files
+                if progress != last_progress:
+                    self.progress_signal.emit(progress)
+                    last_progress = progress
+
+            await asyncio.gather(*(upload_batch(batch) for batch in batches))
+
+    def upload_with_git(self, project, files_to_upload, total_files):
+        """克隆到临时目录，拷入所有文件后用一次 git push 提交"""
+        self.log_signal.emit("使用 git push 批量上传...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            callbacks = pygit2.RemoteCallbacks(credentials=pygit2.UserPass('oauth2', self.token))
+            repo = pygit2.clone_repository(project.http_url_to_repo, tmpdir, callbacks=callbacks)
+
+            last_progress = -1
+            for index, (file_full_path, parsed_file_path) in enumerate(files_to_upload):
+                target = os.path.join(tmpdir, parsed_file_path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(file_full_path, target)
+
+                # 拷贝阶段占进度条前 80%，push 完成后到 100%
+                progress = (index + 1) * 80 // total_files
+                if progress != last_progress:
+                    self.progress_signal.emit(progress)
+                    last_progress = progress
+
+            repo.index.add_all()
+            repo.index.write()
+            tree = repo.index.write_tree()
+            signature = pygit2.Signature('GitLab Uploader', 'gitlab-uploader@localhost')
+            parents = [] if repo.head_is_unborn else [repo.head.target]
+            repo.create_commit('refs/heads/main', signature, signature, 'Upload files', tree, parents)
+
+            self.log_signal.emit("推送中...")
+            repo.remotes['origin'].push(['refs/heads/main'], callbacks=callbacks)
+        self.progress_signal.emit(100)
+
 class UploadApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -118,6 +464,14 @@ class UploadApp(QWidget):
         self.load_settings()
         self.init_tray_icon()
 
+        # 日志先进缓冲区，由定时器批量刷入 QTextEdit：
+        # 上传上万个文件时逐条 append 会让界面线程忙于重排
+        self._log_buffer = []
+        self._log_timer = QTimer(self)
+        self._log_timer.setInterval(100)
+        self._log_timer.timeout.connect(self.flush_log)
+        self._log_timer.start()
+
     def initUI(self):
         self.setWindowTitle('GitLab File Uploader')
         self.setGeometry(100, 100, 400, 500)  # 设置较大的窗口大小
@@ -213,6 +567,7 @@ class UploadApp(QWidget):
 
     def upload_files(self):
         self.log_area.clear()
+        self._log_buffer.clear()
         self.gitlab_url = self.gitlab_url_input.currentText()  # 获取当前选中的 GitLab URL
         self.token = self.token_input.text()
         self.project_id = self.project_id_input.text()
@@ -241,7 +596,12 @@ class UploadApp(QWidget):
         self.worker.start()
 
     def log(self, message):
-        self.log_area.append(message)
+        self._log_buffer.append(message)
+
+    def flush_log(self):
+        if self._log_buffer:
+            self.log_area.append('<br>'.join(self._log_buffer))
+            self._log_buffer.clear()
 
     def save_settings(self):
         config = {
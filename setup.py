@@ -0,0 +1,11 @@
+"""可选的 fastenc 扩展构建：python setup.py build_ext --inplace
+
+没有 Cython 或编译器时可以跳过，主程序会自动退回纯 Python 实现。
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='fastenc',
+    ext_modules=cythonize('fastenc.pyx'),
+)